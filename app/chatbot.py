@@ -1,12 +1,16 @@
 import json
+import logging
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from app.index_versions import index_dir_for, read_current
 from app.preprocessing import TextPreprocessor
-from app.rag import TfidfRAGRetriever
+from app.rag import TfidfRAGRetriever, has_rag_index, vocabulary_nbytes
+
+logger = logging.getLogger(__name__)
 
 
 class FAQChatbot:
@@ -35,15 +39,55 @@ class FAQChatbot:
         self._prepare_faq_vectors()
 
         # ---- RAG setup (optional) ----
+        self.enable_rag = bool(enable_rag)
+        self.rag_index_dir = Path(rag_index_dir)
         self.rag: Optional[TfidfRAGRetriever] = None
-        if enable_rag:
+        self._rag_pointer: Optional[str] = None
+        if self.enable_rag:
+            # pointer dibaca sekali: versi yang di-load == versi yang dicatat
+            self._rag_pointer = read_current(self.rag_index_dir)
             try:
-                index_dir = Path(rag_index_dir)
-                if (index_dir / "embeddings.npz").exists() and (index_dir / "tfidf.pkl").exists():
-                    self.rag = TfidfRAGRetriever(index_dir)
+                self.rag = self._load_rag(self._rag_pointer)
             except Exception:
+                logger.exception("Gagal load index RAG di %s, fallback handbook nonaktif", self.rag_index_dir)
                 self.rag = None
 
+    def _load_rag(self, pointer: Optional[str]) -> Optional[TfidfRAGRetriever]:
+        index_dir = index_dir_for(self.rag_index_dir, pointer)
+        if index_dir is None or not has_rag_index(index_dir):
+            return None
+        return TfidfRAGRetriever(index_dir)
+
+    def refresh_rag(self) -> bool:
+        """
+        Jika pointer `current` index RAG berubah, load versi baru lalu tukar referensinya.
+        Request yang sedang berjalan tetap memakai retriever lama sampai selesai.
+        Return True jika retriever diganti.
+        """
+        if not self.enable_rag:
+            return False
+
+        pointer = read_current(self.rag_index_dir)
+        if pointer is None or pointer == self._rag_pointer:
+            return False
+
+        try:
+            new_rag = self._load_rag(pointer)
+        except Exception:
+            logger.exception("Gagal load index RAG versi %s, tetap pakai versi lama", pointer)
+            # tandai supaya versi rusak tidak dicoba ulang terus-menerus
+            self._rag_pointer = pointer
+            return False
+
+        if new_rag is None:
+            logger.error("Index RAG versi %s tidak ditemukan / tidak lengkap, tetap pakai versi lama", pointer)
+            self._rag_pointer = pointer
+            return False
+
+        self.rag = new_rag
+        self._rag_pointer = pointer
+        return True
+
     def _load_faq(self):
         with open(self.faq_path, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -63,6 +107,20 @@ class FAQChatbot:
 
         self.tfidf_matrix = self.vectorizer.fit_transform(self.questions)
 
+    def nbytes(self) -> int:
+        """
+        Estimasi memori index FAQ + RAG (dipakai cache LRU multi-tenant).
+        """
+        m = self.tfidf_matrix
+        total = int(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes)
+        total += vocabulary_nbytes(self.vectorizer)
+        total += sum(len(q) for q in self.questions)
+        total += sum(len(a) for a in self.answers)
+        rag = self.rag
+        if rag is not None:
+            total += rag.nbytes()
+        return total
+
     def _format_rag_answer(self, text: str) -> str:
         """
         Rapikan jawaban dari chunk handbook agar lebih enak dibaca.
@@ -83,6 +141,13 @@ class FAQChatbot:
         return text
 
     def get_answer(self, user_input: str):
+        return self.get_answers(user_input, [(self.faq_threshold, self.rag_score_threshold)])[0]
+
+    def get_answers(self, user_input: str, thresholds: Sequence[Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """
+        Jawab satu pertanyaan untuk beberapa pasangan (faq_threshold, rag_score_threshold).
+        Skor FAQ dan hasil RAG dihitung sekali lalu dipakai ulang untuk semua pasangan.
+        """
         user_input_clean = self.prep.clean_text(user_input)
 
         # 1) Coba jawab dari FAQ
@@ -92,40 +157,52 @@ class FAQChatbot:
         best_idx = int(sim.argmax())
         best_score = float(sim[best_idx])
 
-        if best_score >= self.faq_threshold:
-            return {
-                "answer": self.answers[best_idx],
+        rag = self.rag  # satu referensi per request (bisa di-swap oleh refresh_rag)
+        rag_hits = None
+
+        results: List[Dict[str, Any]] = []
+        for faq_threshold, rag_score_threshold in thresholds:
+            if best_score >= faq_threshold:
+                results.append({
+                    "answer": self.answers[best_idx],
+                    "confidence": best_score,
+                    "source": "faq",
+                    "contexts": [],
+                })
+                continue
+
+            # 2) Fallback ke RAG (handbook) jika tersedia
+            if rag is not None:
+                if rag_hits is None:
+                    # ambil dengan threshold terendah; top-k dipilih sebelum filter threshold
+                    rag_hits = rag.retrieve(
+                        user_input_clean,
+                        top_k=self.rag_top_k,
+                        score_threshold=min(float(t) for _, t in thresholds),
+                    )
+                hits = [h for h in rag_hits if h.score >= rag_score_threshold]
+                if hits:
+                    best_text = hits[0].text  # ambil chunk terbaik saja
+                    answer = self._format_rag_answer(best_text)
+
+                    results.append({
+                        "answer": answer,
+                        "confidence": float(hits[0].score),
+                        "source": "handbook",
+                        "contexts": [
+                            {"id": h.doc_id, "score": float(h.score), "metadata": h.metadata} for h in hits
+                        ],
+                    })
+                    continue
+
+            results.append({
+                "answer": "Maaf, saya belum menemukan jawaban yang sesuai.",
                 "confidence": best_score,
-                "source": "faq",
+                "source": "none",
                 "contexts": [],
-            }
-
-        # 2) Fallback ke RAG (handbook) jika tersedia
-        if self.rag is not None:
-            hits = self.rag.retrieve(
-                user_input_clean,
-                top_k=self.rag_top_k,
-                score_threshold=self.rag_score_threshold,
-            )
-            if hits:
-                best_text = hits[0].text  # ambil chunk terbaik saja
-                answer = self._format_rag_answer(best_text)
-
-                return {
-                    "answer": answer,
-                    "confidence": float(hits[0].score),
-                    "source": "handbook",
-                    "contexts": [
-                        {"id": h.doc_id, "score": float(h.score), "metadata": h.metadata} for h in hits
-                    ],
-                }
-
-        return {
-            "answer": "Maaf, saya belum menemukan jawaban yang sesuai.",
-            "confidence": best_score,
-            "source": "none",
-            "contexts": [],
-        }
+            })
+
+        return results
 
 
 if __name__ == "__main__":
@@ -12,6 +12,26 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 FAQ_PATH = DATA_DIR / "faq.json"
 
+# =========================
+# MODEL / INDEX PATH
+# =========================
+MODELS_DIR = BASE_DIR / "models"
+RAG_INDEX_DIR = MODELS_DIR / "vector_store"
+
+# =========================
+# MULTI-TENANT CONFIG
+# =========================
+# Tenant lain: data/tenants/<id>/faq.json + models/tenants/<id>/vector_store
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")
+TENANTS_DATA_DIR = DATA_DIR / "tenants"
+TENANTS_INDEX_DIR = MODELS_DIR / "tenants"
+
+# Batas total byte index (FAQ + RAG) yang boleh resident di memori (LRU)
+INDEX_CACHE_MAX_BYTES = int(os.getenv("INDEX_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Interval (detik) cek versi baru index RAG (pointer `current`); 0 = nonaktif
+INDEX_POLL_SECONDS = float(os.getenv("INDEX_POLL_SECONDS", "30"))
+
 # =========================
 # CHATBOT CONFIG
 # =========================
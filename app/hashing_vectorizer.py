@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+HASHING_CONFIG_NAME = "hashing.json"
+IDF_NAME = "idf.npy"
+
+
+class HashingTfidf:
+    """
+    TF-IDF berbasis hashing trick (tanpa vocabulary global), untuk build out-of-core:
+    - partial_fit(): akumulasi document frequency per batch (pass 1)
+    - finalize(): hitung IDF (rumus sama dengan TfidfVectorizer, smooth_idf=True)
+    - transform(): hashing -> kali IDF -> L2 normalize (pass 2 dan saat query)
+    """
+
+    def __init__(self, n_features: int = 2**20, ngram_range: Tuple[int, int] = (1, 2)) -> None:
+        self.n_features = int(n_features)
+        self.ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+        self.hasher = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=self.ngram_range,
+            lowercase=False,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32,
+        )
+        self.n_docs = 0
+        self._df = np.zeros(self.n_features, dtype=np.int64)
+        self.idf: np.ndarray | None = None
+
+    def partial_fit(self, texts: Iterable[str]) -> "HashingTfidf":
+        X = self.hasher.transform(texts).tocsr()
+        X.sum_duplicates()  # tiap baris: index unik -> bincount = document frequency
+        self._df += np.bincount(X.indices, minlength=self.n_features)
+        self.n_docs += X.shape[0]
+        return self
+
+    def finalize(self) -> "HashingTfidf":
+        if self.n_docs == 0:
+            raise ValueError("Belum ada dokumen (partial_fit belum dipanggil).")
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self._df)) + 1.0
+        # term yang tidak ada di korpus diabaikan (sama seperti term di luar vocabulary)
+        idf[self._df == 0] = 0.0
+        self.idf = idf.astype(np.float32)
+        self._df = np.zeros(0, dtype=np.int64)  # tidak dibutuhkan lagi
+        return self
+
+    def transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        if self.idf is None:
+            raise ValueError("IDF belum dihitung (panggil finalize() atau load()).")
+        X = self.hasher.transform(texts).tocsr()
+        X.data *= self.idf[X.indices]  # kali IDF langsung di nilai CSR (tanpa matriks diagonal)
+        X.eliminate_zeros()  # term dengan IDF 0 (tidak ada di korpus)
+        return normalize(X, norm="l2", copy=False).astype(np.float32, copy=False)
+
+    def nbytes(self) -> int:
+        return int(self._df.nbytes) + (int(self.idf.nbytes) if self.idf is not None else 0)
+
+    def save(self, folder: str | Path) -> None:
+        if self.idf is None:
+            raise ValueError("IDF belum dihitung, tidak ada yang disimpan.")
+        folder = Path(folder)
+        config = {"n_features": self.n_features, "ngram_range": list(self.ngram_range), "n_docs": self.n_docs}
+        with open(folder / HASHING_CONFIG_NAME, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        np.save(folder / IDF_NAME, self.idf)
+
+    @classmethod
+    def load(cls, folder: str | Path) -> "HashingTfidf":
+        folder = Path(folder)
+        with open(folder / HASHING_CONFIG_NAME, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        obj = cls(n_features=config["n_features"], ngram_range=tuple(config["ngram_range"]))
+        obj.n_docs = int(config.get("n_docs", 0))
+        obj._df = np.zeros(0, dtype=np.int64)
+        obj.idf = np.load(folder / IDF_NAME).astype(np.float32)
+        if obj.idf.shape != (obj.n_features,):
+            raise ValueError(f"{IDF_NAME} tidak konsisten dengan n_features={obj.n_features}.")
+        return obj
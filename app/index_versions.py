@@ -0,0 +1,230 @@
+"""
+Index RAG berversi:
+
+    <root>/
+      versions/<version>/   # immutable: embeddings.npz, docs.json, tfidf.pkl, manifest.json
+      current               # pointer (isi: nama versi aktif), diganti secara atomik
+
+Layout lama (file index langsung di <root>) tetap didukung sebagai fallback.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+VERSIONS_DIRNAME = "versions"
+CURRENT_POINTER = "current"
+MANIFEST_NAME = "manifest.json"
+
+
+class IndexIntegrityError(ValueError):
+    """
+    Isi folder versi index tidak cocok dengan manifest (file hilang / checksum beda).
+    """
+
+
+def _sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _fsync_dir(folder: Path) -> None:
+    # supaya rename benar-benar tersimpan di disk (tidak didukung di Windows)
+    try:
+        fd = os.open(str(folder), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def new_version_id() -> str:
+    # urutan leksikografis == urutan waktu build (dipakai rollback)
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + "-" + uuid.uuid4().hex[:6]
+
+
+def versions_dir(root: str | Path) -> Path:
+    return Path(root) / VERSIONS_DIRNAME
+
+
+def list_versions(root: str | Path) -> List[str]:
+    """
+    Semua versi yang sudah dipublish (urut dari yang paling lama).
+    """
+    vdir = versions_dir(root)
+    if not vdir.is_dir():
+        return []
+    return sorted(
+        p.name for p in vdir.iterdir() if p.is_dir() and not p.name.startswith(".") and (p / MANIFEST_NAME).exists()
+    )
+
+
+def read_current(root: str | Path) -> Optional[str]:
+    pointer = Path(root) / CURRENT_POINTER
+    try:
+        version = pointer.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def resolve_index_dir(root: str | Path) -> Optional[Path]:
+    """
+    Folder index yang aktif: versi yang ditunjuk `current`, atau layout lama
+    (embeddings.npz langsung di root). None jika belum ada index.
+    """
+    return index_dir_for(root, read_current(root))
+
+
+def index_dir_for(root: str | Path, version: Optional[str]) -> Optional[Path]:
+    """
+    Seperti resolve_index_dir, tapi memakai versi yang sudah dibaca dari `current`
+    (pointer tidak dibaca ulang). version None -> layout lama.
+    """
+    root = Path(root)
+    if version is not None:
+        return versions_dir(root) / version
+    if (root / "embeddings.npz").exists():
+        return root
+    return None
+
+
+def write_manifest(version_dir: str | Path, version: str, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    version_dir = Path(version_dir)
+    files = {}
+    for p in sorted(version_dir.rglob("*")):
+        if not p.is_file() or p.name == MANIFEST_NAME:
+            continue
+        rel = p.relative_to(version_dir).as_posix()
+        files[rel] = {"sha256": _sha256(p), "size": p.stat().st_size}
+
+    manifest = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files": files,
+    }
+    if extra:
+        manifest.update(extra)
+
+    with open(version_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def read_manifest(version_dir: str | Path) -> Dict[str, Any]:
+    with open(Path(version_dir) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_manifest(version_dir: str | Path) -> Dict[str, Any]:
+    """
+    Cek semua file di manifest: harus ada, ukuran dan sha256 sama.
+    """
+    version_dir = Path(version_dir)
+    try:
+        manifest = read_manifest(version_dir)
+    except FileNotFoundError as e:
+        raise IndexIntegrityError(f"{MANIFEST_NAME} tidak ditemukan di {version_dir}") from e
+
+    for rel, info in manifest.get("files", {}).items():
+        p = version_dir / rel
+        if not p.is_file():
+            raise IndexIntegrityError(f"File index hilang: {p}")
+        if p.stat().st_size != int(info["size"]) or _sha256(p) != info["sha256"]:
+            raise IndexIntegrityError(f"Checksum tidak cocok: {p}")
+    return manifest
+
+
+def set_current(root: str | Path, version: str) -> None:
+    """
+    Ganti pointer `current` secara atomik (tulis file sementara lalu os.replace).
+    """
+    root = Path(root)
+    verify_manifest(versions_dir(root) / version)
+
+    tmp = root / f".{CURRENT_POINTER}.tmp-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / CURRENT_POINTER)
+    _fsync_dir(root)
+
+
+def publish_version(
+    root: str | Path,
+    build: Callable[[Path], None],
+    *,
+    activate: bool = True,
+    extra_manifest: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Build index ke folder staging, tulis manifest, rename ke versions/<version>,
+    lalu (opsional) pindahkan pointer `current`. Versi yang aktif tidak pernah disentuh.
+    """
+    root = Path(root)
+    vdir = versions_dir(root)
+    vdir.mkdir(parents=True, exist_ok=True)
+
+    version = new_version_id()
+    staging = vdir / f".staging-{version}"
+    staging.mkdir()
+    try:
+        build(staging)
+        write_manifest(staging, version, extra_manifest)
+        os.replace(staging, vdir / version)
+        _fsync_dir(vdir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if activate:
+        set_current(root, version)
+    return version
+
+
+def rollback(root: str | Path, version: Optional[str] = None) -> str:
+    """
+    Aktifkan kembali versi sebelumnya (atau versi tertentu jika diberikan).
+    """
+    root = Path(root)
+    versions = list_versions(root)
+
+    if version is None:
+        current = read_current(root)
+        older = [v for v in versions if current is None or v < current]
+        if not older:
+            raise ValueError(f"Tidak ada versi sebelum {current!r} untuk rollback.")
+        version = older[-1]
+    elif version not in versions:
+        raise ValueError(f"Versi index tidak ditemukan: {version!r}")
+
+    set_current(root, version)
+    return version
+
+
+def prune_versions(root: str | Path, keep: int) -> List[str]:
+    """
+    Hapus versi lama, sisakan `keep` versi terbaru (versi aktif tidak pernah dihapus).
+    """
+    root = Path(root)
+    current = read_current(root)
+    versions = list_versions(root)
+    to_remove = [v for v in versions[: max(0, len(versions) - max(1, int(keep)))] if v != current]
+    for v in to_remove:
+        shutil.rmtree(versions_dir(root) / v, ignore_errors=True)
+    return to_remove
@@ -1,13 +1,43 @@
-from typing import Any, Dict, List
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import Response, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 
-from app.chatbot import FAQChatbot
-from app.config import FAQ_PATH, API_CONFIG
+from app.config import (
+    API_CONFIG,
+    DEFAULT_TENANT,
+    FAQ_PATH,
+    INDEX_CACHE_MAX_BYTES,
+    INDEX_POLL_SECONDS,
+    RAG_INDEX_DIR,
+    TENANTS_DATA_DIR,
+    TENANTS_INDEX_DIR,
+)
+from app.tenants import TenantNotFoundError, TenantRegistry
+
+# =========================
+# LOAD CHATBOT (per tenant)
+# =========================
+registry = TenantRegistry(
+    default_tenant=DEFAULT_TENANT,
+    default_faq_path=FAQ_PATH,
+    default_index_dir=RAG_INDEX_DIR,
+    tenants_data_dir=TENANTS_DATA_DIR,
+    tenants_index_dir=TENANTS_INDEX_DIR,
+    max_bytes=INDEX_CACHE_MAX_BYTES,
+)
+registry.get(DEFAULT_TENANT)  # tenant utama langsung di-load saat startup
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # index RAG versi baru di-load di background lalu di-swap tanpa restart
+    registry.start_watcher(INDEX_POLL_SECONDS)
+    yield
+    registry.stop_watcher()
 
 # =========================
 # FASTAPI APP
@@ -16,6 +46,7 @@ app = FastAPI(
     title=API_CONFIG["title"],
     version=API_CONFIG["version"],
     description=API_CONFIG["description"],
+    lifespan=lifespan,
 )
 
 # =========================
@@ -24,16 +55,12 @@ app = FastAPI(
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
-# =========================
-# LOAD CHATBOT
-# =========================
-chatbot = FAQChatbot(str(FAQ_PATH), enable_rag=True)
-
 # =========================
 # SCHEMAS
 # =========================
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, description="Pertanyaan dari user")
+    tenant: Optional[str] = Field(None, description="ID tenant / knowledge base (default: tenant utama)")
 
 class ContextItem(BaseModel):
     id: str
@@ -60,6 +87,11 @@ def favicon():
 
 @app.post("/chat", response_model=ChatResponse)
 def chat(req: ChatRequest):
+    try:
+        chatbot = registry.get(req.tenant)
+    except TenantNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
     result = chatbot.get_answer(req.message)
 
     contexts_raw = result.get("contexts", [])
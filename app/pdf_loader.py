@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 try:
     from pypdf import PdfReader
@@ -18,18 +18,24 @@ class PDFPage:
     text: str
 
 
-def load_pdf_pages(pdf_path: str | Path) -> List[PDFPage]:
+def iter_pdf_pages(pdf_path: str | Path) -> Iterator[PDFPage]:
     """
-    Extract teks per halaman dari PDF.
+    Extract teks per halaman dari PDF, satu halaman per iterasi (streaming).
     Catatan: jika PDF hasil scan (gambar), teks bisa kosong (butuh OCR).
     """
     pdf_path = Path(pdf_path)
     reader = PdfReader(str(pdf_path))
 
-    pages: List[PDFPage] = []
     for i, page in enumerate(reader.pages):
         text = page.extract_text() or ""
         # Rapikan sedikit
         text = text.replace("\u00a0", " ").strip()
-        pages.append(PDFPage(page_number=i + 1, text=text))
-    return pages
+        yield PDFPage(page_number=i + 1, text=text)
+
+
+def load_pdf_pages(pdf_path: str | Path) -> List[PDFPage]:
+    """
+    Extract teks per halaman dari PDF.
+    Catatan: jika PDF hasil scan (gambar), teks bisa kosong (butuh OCR).
+    """
+    return list(iter_pdf_pages(pdf_path))
@@ -7,8 +7,27 @@ from typing import Any, Dict, List, Optional
 
 import numpy as np
 
+from app.hashing_vectorizer import HASHING_CONFIG_NAME, HashingTfidf
+from app.index_versions import MANIFEST_NAME, verify_manifest
 from app.preprocessing import TextPreprocessor
-from app.vector_store import SimpleVectorStore, SearchResult
+from app.vector_store import SimpleVectorStore, SparseVectorStore, SearchResult
+
+
+def has_rag_index(index_dir: str | Path) -> bool:
+    """
+    True jika folder berisi index RAG (mode TF-IDF vocabulary atau mode hashing).
+    """
+    index_dir = Path(index_dir)
+    return (index_dir / "tfidf.pkl").exists() or (index_dir / HASHING_CONFIG_NAME).exists()
+
+
+def vocabulary_nbytes(vectorizer: Any) -> int:
+    """
+    Estimasi memori vocabulary_ milik vectorizer (dict term -> index).
+    """
+    vocab = getattr(vectorizer, "vocabulary_", None) or {}
+    # ~ panjang term + overhead str/int/slot dict per entry
+    return sum(len(term) for term in vocab) + 120 * len(vocab)
 
 
 @dataclass
@@ -21,15 +40,27 @@ class RAGAnswer:
 class TfidfRAGRetriever:
     """
     RAG retriever berbasis TF-IDF embeddings.
-    - Load vector store + tfidf.pkl
+    - Load vector store + tfidf.pkl (checksum dicek jika ada manifest.json)
+    - Index hasil build out-of-core (hashing.json): SparseVectorStore + HashingTfidf
     - Query -> embedding -> similarity search -> return top chunks
     """
 
     def __init__(self, index_dir: str | Path):
         self.index_dir = Path(index_dir)
-        self.store = SimpleVectorStore.load(self.index_dir)
+        self.version: Optional[str] = None
+        if (self.index_dir / MANIFEST_NAME).exists():
+            self.version = verify_manifest(self.index_dir).get("version")
+
         self.prep = TextPreprocessor()
 
+        self.hashing = (self.index_dir / HASHING_CONFIG_NAME).exists()
+        if self.hashing:
+            self.store = SparseVectorStore.load(self.index_dir)
+            self.vectorizer = HashingTfidf.load(self.index_dir)
+            return
+
+        self.store = SimpleVectorStore.load(self.index_dir)
+
         tfidf_path = self.index_dir / "tfidf.pkl"
         if not tfidf_path.exists():
             raise FileNotFoundError(f"tfidf.pkl tidak ditemukan di {self.index_dir}")
@@ -37,8 +68,16 @@ class TfidfRAGRetriever:
         with open(tfidf_path, "rb") as f:
             self.vectorizer = pickle.load(f)
 
-    def embed_query(self, query: str) -> np.ndarray:
+    def nbytes(self) -> int:
+        if self.hashing:
+            return self.store.nbytes() + self.vectorizer.nbytes()
+        return self.store.nbytes() + vocabulary_nbytes(self.vectorizer)
+
+    def embed_query(self, query: str) -> Any:
         q = self.prep.clean_text(query)
+        if self.hashing:
+            # hashing: tidak perlu lookup vocabulary, hasilnya sparse (1, n_features)
+            return self.vectorizer.transform([q])
         vec = self.vectorizer.transform([q]).toarray().astype(np.float32)[0]
         return vec
 
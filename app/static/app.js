@@ -3,6 +3,9 @@ const form = document.getElementById("form");
 const input = document.getElementById("input");
 const btnClear = document.getElementById("btnClear");
 
+// tenant / knowledge base bisa dipilih lewat URL, mis. /?tenant=fkip
+const tenant = new URLSearchParams(window.location.search).get("tenant");
+
 function addMsg(role, text, meta = "") {
   const wrap = document.createElement("div");
   wrap.className = `msg ${role}`;
@@ -41,7 +44,7 @@ async function sendMessage(message) {
     const res = await fetch("/chat", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ message })
+      body: JSON.stringify(tenant ? { message, tenant } : { message })
     });
 
     if (!res.ok) {
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.chatbot import FAQChatbot
+
+logger = logging.getLogger(__name__)
+
+_TENANT_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+class TenantNotFoundError(LookupError):
+    """
+    Tenant / knowledge base tidak dikenal (id tidak valid atau FAQ tidak ada).
+    """
+
+
+@dataclass
+class TenantPaths:
+    tenant_id: str
+    faq_path: Path
+    rag_index_dir: Path
+
+
+@dataclass
+class _CacheEntry:
+    bot: FAQChatbot
+    nbytes: int
+
+
+def _validate_tenant_id(tenant_id: Optional[str], default_tenant: str) -> str:
+    tenant_id = tenant_id or default_tenant
+    if not _TENANT_ID_RE.match(tenant_id):
+        raise TenantNotFoundError(f"Tenant id tidak valid: {tenant_id!r}")
+    return tenant_id
+
+
+def resolve_tenant_paths(
+    tenant_id: Optional[str],
+    *,
+    default_tenant: str,
+    default_faq_path: str | Path,
+    default_index_dir: str | Path,
+    tenants_data_dir: str | Path,
+    tenants_index_dir: str | Path,
+) -> TenantPaths:
+    """
+    Lokasi faq.json + root index RAG milik tenant (None -> tenant utama).
+    """
+    tenant_id = _validate_tenant_id(tenant_id, default_tenant)
+
+    if tenant_id == default_tenant:
+        faq_path = Path(default_faq_path)
+        index_dir = Path(default_index_dir)
+    else:
+        faq_path = Path(tenants_data_dir) / tenant_id / "faq.json"
+        index_dir = Path(tenants_index_dir) / tenant_id / "vector_store"
+
+    if not faq_path.exists():
+        raise TenantNotFoundError(f"Tenant tidak ditemukan: {tenant_id!r}")
+
+    return TenantPaths(tenant_id=tenant_id, faq_path=faq_path, rag_index_dir=index_dir)
+
+
+def default_chatbot_factory(paths: TenantPaths) -> FAQChatbot:
+    return FAQChatbot(str(paths.faq_path), enable_rag=True, rag_index_dir=str(paths.rag_index_dir))
+
+
+class TenantRegistry:
+    """
+    Registry chatbot per tenant (fakultas / kampus):
+    - get(): load FAQ + RAG index tenant secara on-demand
+    - cache LRU dengan batas total byte index yang resident
+    - request pertama yang bersamaan untuk tenant "dingin" digabung jadi satu load
+    - refresh(): ganti index RAG tenant yang resident jika ada versi baru
+    """
+
+    def __init__(
+        self,
+        *,
+        default_tenant: str,
+        default_faq_path: str | Path,
+        default_index_dir: str | Path,
+        tenants_data_dir: str | Path,
+        tenants_index_dir: str | Path,
+        max_bytes: int,
+        factory: Callable[[TenantPaths], FAQChatbot] = default_chatbot_factory,
+    ) -> None:
+        self.default_tenant = default_tenant
+        self.default_faq_path = Path(default_faq_path)
+        self.default_index_dir = Path(default_index_dir)
+        self.tenants_data_dir = Path(tenants_data_dir)
+        self.tenants_index_dir = Path(tenants_index_dir)
+        self.max_bytes = int(max_bytes)
+        self._factory = factory
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._resident_bytes = 0
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def resolve(self, tenant_id: Optional[str]) -> TenantPaths:
+        return resolve_tenant_paths(
+            tenant_id,
+            default_tenant=self.default_tenant,
+            default_faq_path=self.default_faq_path,
+            default_index_dir=self.default_index_dir,
+            tenants_data_dir=self.tenants_data_dir,
+            tenants_index_dir=self.tenants_index_dir,
+        )
+
+    def get(self, tenant_id: Optional[str] = None) -> FAQChatbot:
+        # cek cache dulu; stat file FAQ hanya saat load tenant yang belum resident
+        key = _validate_tenant_id(tenant_id, self.default_tenant)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry.bot
+
+            fut = self._loading.get(key)
+            is_loader = fut is None
+            if is_loader:
+                fut = Future()
+                self._loading[key] = fut
+
+        if not is_loader:
+            # tunggu load yang sedang berjalan (error juga ikut diteruskan)
+            return fut.result()
+
+        try:
+            bot = self._factory(self.resolve(key))
+            nbytes = bot.nbytes()
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            fut.set_exception(e)
+            raise
+
+        with self._lock:
+            self._cache[key] = _CacheEntry(bot=bot, nbytes=nbytes)
+            self._resident_bytes += nbytes
+            self._loading.pop(key, None)
+            self._evict_locked(keep=key)
+
+        fut.set_result(bot)
+        return bot
+
+    def refresh(self) -> List[str]:
+        """
+        Cek pointer `current` index RAG setiap tenant yang resident; load versi baru
+        di luar lock lalu tukar referensinya. Return daftar tenant yang diganti.
+        """
+        with self._lock:
+            snapshot = list(self._cache.items())
+
+        swapped: List[str] = []
+        for key, entry in snapshot:
+            try:
+                changed = entry.bot.refresh_rag()
+            except Exception:
+                logger.exception("Refresh index tenant %s gagal", key)
+                continue
+            if not changed:
+                continue
+
+            swapped.append(key)
+            nbytes = entry.bot.nbytes()
+            with self._lock:
+                if self._cache.get(key) is entry:
+                    self._resident_bytes += nbytes - entry.nbytes
+                    entry.nbytes = nbytes
+                    self._evict_locked(keep=key)
+        return swapped
+
+    def start_watcher(self, interval: float) -> None:
+        """
+        Jalankan refresh() berkala di background thread (daemon).
+        """
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval):
+                self.refresh()
+
+        self._watcher = threading.Thread(target=_loop, name="index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _evict_locked(self, *, keep: str) -> None:
+        # buang tenant yang paling lama tidak dipakai sampai di bawah batas;
+        # tenant yang baru di-load tetap disimpan walau sendirian melebihi batas
+        while self._resident_bytes > self.max_bytes and len(self._cache) > 1:
+            oldest = next(iter(self._cache))
+            if oldest == keep:
+                self._cache.move_to_end(oldest)
+                continue
+            entry = self._cache.pop(oldest)
+            self._resident_bytes -= entry.nbytes
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from array import array
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence
 
 import numpy as np
+import scipy.sparse as sp
 
 
 @dataclass
@@ -53,6 +57,19 @@ class SimpleVectorStore:
             raise ValueError(f"Dimensi query ({qv.shape[1]}) != dim store ({dim}).")
         return qv
 
+    def nbytes(self) -> int:
+        """
+        Estimasi memori yang dipakai store (embeddings + teks + metadata).
+        """
+        total = 0
+        for arr in (self._emb, self._emb_norm):
+            if arr is not None:
+                total += int(arr.nbytes)
+        total += sum(len(x) for x in self._ids)
+        total += sum(len(x) for x in self._texts)
+        total += len(json.dumps(self._metas, ensure_ascii=False))
+        return total
+
     def add(
         self,
         *,
@@ -165,3 +182,183 @@ class SimpleVectorStore:
             raise ValueError("docs.json tidak konsisten dengan embeddings.")
 
         return obj
+
+
+class SparseVectorStore:
+    """
+    Vector store sparse (CSR) untuk index hasil build out-of-core:
+    - rows/block_*.npz: blok baris embedding (sudah L2-normalized)
+    - docs.jsonl + doc_offsets.npy: id/teks/metadata, dibaca dari disk hanya untuk hasil search
+
+    docs.jsonl dibuka sekali saat load() dan dibaca dengan os.pread, jadi tetap bisa dipakai
+    walaupun folder versinya sudah dihapus (prune) dan aman dipanggil dari banyak thread.
+    Di platform tanpa os.pread (Windows) dipakai seek + read yang dijaga lock.
+    """
+
+    ROWS_DIRNAME = "rows"
+    DOCS_NAME = "docs.jsonl"
+    OFFSETS_NAME = "doc_offsets.npy"
+
+    def __init__(self, folder: str | Path, matrix: sp.csr_matrix, offsets: np.ndarray, docs_file: BinaryIO) -> None:
+        self.folder = Path(folder)
+        self._matrix = matrix
+        self._offsets = offsets
+        self._docs: Optional[BinaryIO] = docs_file
+        self._docs_size = os.fstat(docs_file.fileno()).st_size
+        self._docs_lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._docs is not None:
+            self._docs.close()
+            self._docs = None
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return int(self._matrix.shape[0])
+
+    def nbytes(self) -> int:
+        m = self._matrix
+        return int(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes + self._offsets.nbytes)
+
+    def _read_at(self, docs: BinaryIO, offset: int, size: int) -> bytes:
+        if hasattr(os, "pread"):
+            buf = b""
+            while len(buf) < size:
+                part = os.pread(docs.fileno(), size - len(buf), offset + len(buf))
+                if not part:
+                    break
+                buf += part
+            return buf
+
+        with self._docs_lock:
+            docs.seek(offset)
+            return docs.read(size)
+
+    def _read_docs(self, idxs: Sequence[int]) -> List[Dict[str, Any]]:
+        docs_file = self._docs
+        if docs_file is None:
+            raise ValueError("SparseVectorStore sudah ditutup.")
+
+        docs = []
+        n = len(self._offsets)
+        for i in idxs:
+            start = int(self._offsets[i])
+            end = int(self._offsets[i + 1]) if i + 1 < n else self._docs_size
+            buf = self._read_at(docs_file, start, end - start)
+            if len(buf) != end - start:
+                raise ValueError("docs.jsonl terpotong / tidak konsisten dengan doc_offsets.npy.")
+            docs.append(json.loads(buf))
+        return docs
+
+    def search(
+        self,
+        *,
+        query_embedding: Any,
+        top_k: int = 5,
+        score_threshold: Optional[float] = None,
+    ) -> List[SearchResult]:
+        if len(self) == 0:
+            return []
+
+        if sp.issparse(query_embedding):
+            qv = sp.csr_matrix(query_embedding, dtype=np.float32)
+        else:
+            qv = sp.csr_matrix(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))
+        dim = self._matrix.shape[1]
+        if qv.shape != (1, dim):
+            raise ValueError(f"Dimensi query ({qv.shape[1]}) != dim store ({dim}).")
+
+        q_norm = max(float(np.sqrt(qv.multiply(qv).sum())), 1e-12)
+        scores = (self._matrix @ qv.T).toarray().reshape(-1) / q_norm  # cosine sim
+
+        top_k = max(1, int(top_k))
+        k = min(top_k, scores.shape[0])
+
+        idxs = np.argpartition(-scores, kth=k - 1)[:k]
+        idxs = idxs[np.argsort(-scores[idxs])]
+        if score_threshold is not None:
+            idxs = idxs[scores[idxs] >= float(score_threshold)]
+
+        results: List[SearchResult] = []
+        for i, doc in zip(idxs, self._read_docs(idxs)):
+            results.append(
+                SearchResult(
+                    doc_id=str(doc["id"]),
+                    score=float(scores[i]),
+                    text=str(doc["text"]),
+                    metadata=dict(doc.get("metadata", {})),
+                )
+            )
+        return results
+
+    @classmethod
+    def load(cls, folder: str | Path) -> "SparseVectorStore":
+        folder = Path(folder)
+        rows_dir = folder / cls.ROWS_DIRNAME
+        offsets_path = folder / cls.OFFSETS_NAME
+
+        blocks = sorted(rows_dir.glob("block_*.npz"), key=lambda p: int(p.stem.split("_")[1]))
+        if not blocks or not offsets_path.exists() or not (folder / cls.DOCS_NAME).exists():
+            raise FileNotFoundError("rows/block_*.npz, docs.jsonl atau doc_offsets.npy tidak ditemukan.")
+
+        matrix = sp.vstack([sp.load_npz(b) for b in blocks], format="csr", dtype=np.float32)
+        offsets = np.load(offsets_path)
+
+        if offsets.shape[0] != matrix.shape[0]:
+            raise ValueError("docs.jsonl tidak konsisten dengan rows.")
+
+        return cls(folder, matrix, offsets, open(folder / cls.DOCS_NAME, "rb"))
+
+
+class SparseVectorStoreWriter:
+    """
+    Tulis SparseVectorStore secara bertahap (tanpa menahan seluruh korpus di memori):
+    - add_docs(): append id/teks/metadata ke docs.jsonl
+    - add_rows(): simpan satu blok baris sparse ke rows/block_XXXXX.npz
+    - close(): simpan doc_offsets.npy dan cek jumlah docs == jumlah baris (abort(): jika build gagal)
+    """
+
+    def __init__(self, folder: str | Path) -> None:
+        self.folder = Path(folder)
+        (self.folder / SparseVectorStore.ROWS_DIRNAME).mkdir(parents=True, exist_ok=True)
+        self._docs = open(self.folder / SparseVectorStore.DOCS_NAME, "wb")
+        self._offsets = array("q")
+        self._n_rows = 0
+        self._n_blocks = 0
+
+    def add_docs(
+        self,
+        *,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> None:
+        if metadatas is None:
+            metadatas = [{} for _ in range(len(ids))]
+        if not (len(ids) == len(texts) == len(metadatas)):
+            raise ValueError("Panjang ids, texts, metadatas harus sama.")
+
+        for doc_id, text, meta in zip(ids, texts, metadatas):
+            self._offsets.append(self._docs.tell())
+            line = json.dumps({"id": str(doc_id), "text": str(text), "metadata": dict(meta)}, ensure_ascii=False)
+            self._docs.write(line.encode("utf-8") + b"\n")
+
+    def add_rows(self, rows: sp.spmatrix) -> None:
+        rows = sp.csr_matrix(rows, dtype=np.float32)
+        if rows.shape[0] == 0:
+            return
+        path = self.folder / SparseVectorStore.ROWS_DIRNAME / f"block_{self._n_blocks:05d}.npz"
+        sp.save_npz(path, rows, compressed=True)
+        self._n_rows += rows.shape[0]
+        self._n_blocks += 1
+
+    def abort(self) -> None:
+        self._docs.close()
+
+    def close(self) -> None:
+        self._docs.close()
+        if self._n_rows != len(self._offsets):
+            raise ValueError(f"Jumlah baris ({self._n_rows}) != jumlah docs ({len(self._offsets)}).")
+        np.save(self.folder / SparseVectorStore.OFFSETS_NAME, np.frombuffer(self._offsets, dtype=np.int64))
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import argparse
+import itertools
+import json
 import sys
+import tempfile
 from pathlib import Path
 import pickle
+from typing import Any, Dict, Iterator, List, Tuple
 
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -10,48 +15,63 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from app.pdf_loader import load_pdf_pages
+from app.pdf_loader import iter_pdf_pages
 from app.chunker import chunk_text
+from app.hashing_vectorizer import HashingTfidf
+from app.index_versions import list_versions, prune_versions, publish_version, read_current, rollback
 from app.preprocessing import TextPreprocessor
-from app.vector_store import SimpleVectorStore
-
-
-def main():
-    base_dir = ROOT
-    pdf_path = base_dir / "data" / "documents" / "handbook.pdf"
-    index_dir = base_dir / "models" / "vector_store"
-    index_dir.mkdir(parents=True, exist_ok=True)
-
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF tidak ditemukan: {pdf_path}")
-
-    pages = load_pdf_pages(pdf_path)
+from app.vector_store import SimpleVectorStore, SparseVectorStoreWriter
+
+NO_TEXT_ERROR = (
+    "Tidak ada teks yang berhasil diekstrak dari PDF. "
+    "Kemungkinan PDF hasil scan (gambar) dan butuh OCR."
+)
+
+
+def iter_chunks(pdf_paths: List[Path]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Stream (chunk_id, text, metadata) dari semua PDF, halaman demi halaman.
+    """
+    for pdf_path in pdf_paths:
+        for p in iter_pdf_pages(pdf_path):
+            if not p.text.strip():
+                continue
+
+            page_chunks = chunk_text(
+                text=p.text,
+                base_id=f"{pdf_path.stem}_p{p.page_number}",
+                metadata={"source": pdf_path.name, "page": p.page_number},
+                max_chars=300,
+                overlap=60,
+            )
+
+            for ch in page_chunks:
+                yield ch.chunk_id, ch.text, ch.metadata
+
+
+def iter_batches(items: Iterator[Any], batch_size: int) -> Iterator[List[Any]]:
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def build_index(pdf_paths: List[Path], index_dir: Path) -> int:
+    """
+    Build embeddings.npz, docs.json, tfidf.pkl ke `index_dir`. Return jumlah chunk.
+    """
     prep = TextPreprocessor()
 
     all_ids, all_texts, all_metas = [], [], []
 
-    for p in pages:
-        if not p.text.strip():
-            continue
-
-        page_chunks = chunk_text(
-            text=p.text,
-            base_id=f"handbook_p{p.page_number}",
-            metadata={"source": "handbook.pdf", "page": p.page_number},
-            max_chars=300,
-            overlap=60,
-        )
-
-        for ch in page_chunks:
-            all_ids.append(ch.chunk_id)
-            all_texts.append(ch.text)
-            all_metas.append(ch.metadata)
+    for chunk_id, text, meta in iter_chunks(pdf_paths):
+        all_ids.append(chunk_id)
+        all_texts.append(text)
+        all_metas.append(meta)
 
     if not all_texts:
-        raise RuntimeError(
-            "Tidak ada teks yang berhasil diekstrak dari PDF. "
-            "Kemungkinan PDF hasil scan (gambar) dan butuh OCR."
-        )
+        raise RuntimeError(NO_TEXT_ERROR)
 
     clean_texts = prep.preprocess_list(all_texts)
 
@@ -65,9 +85,139 @@ def main():
     with open(index_dir / "tfidf.pkl", "wb") as f:
         pickle.dump(vectorizer, f)
 
-    print(f"✅ RAG index berhasil dibuat di: {index_dir}")
-    print(f"   Total chunks: {len(all_texts)}")
-    print("   File yang dibuat: embeddings.npz, docs.json, tfidf.pkl")
+    return len(all_texts)
+
+
+def build_hashing_index(pdf_paths: List[Path], index_dir: Path, *, n_features: int, batch_size: int) -> int:
+    """
+    Build out-of-core (korpus lebih besar dari RAM) ke `index_dir`:
+    - pass 1: stream chunk -> docs.jsonl + akumulasi document frequency (hashing, tanpa vocabulary)
+    - pass 2: baca ulang teks bersih dari file spool -> TF-IDF -> rows/block_XXXXX.npz
+    Return jumlah chunk.
+    """
+    prep = TextPreprocessor()
+    tfidf = HashingTfidf(n_features=n_features, ngram_range=(1, 2))
+    writer = SparseVectorStoreWriter(index_dir)
+    n_chunks = 0
+
+    # spool teks bersih di luar folder versi (tidak ikut manifest)
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=index_dir.parent) as spool:
+        try:
+            for batch in iter_batches(iter_chunks(pdf_paths), batch_size):
+                ids, texts, metas = zip(*batch)
+                clean = prep.preprocess_list(list(texts))
+
+                tfidf.partial_fit(clean)
+                writer.add_docs(ids=ids, texts=texts, metadatas=metas)
+                for t in clean:
+                    spool.write(json.dumps(t, ensure_ascii=False) + "\n")
+                n_chunks += len(batch)
+
+            if n_chunks == 0:
+                raise RuntimeError(NO_TEXT_ERROR)
+
+            tfidf.finalize()
+            spool.seek(0)
+            for lines in iter_batches(iter(spool), batch_size):
+                writer.add_rows(tfidf.transform([json.loads(line) for line in lines]))
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+    tfidf.save(index_dir)
+    return n_chunks
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build index RAG berversi dari handbook PDF.")
+    parser.add_argument(
+        "--pdf",
+        type=Path,
+        action="append",
+        help="File PDF atau folder berisi PDF (boleh diulang). Default: data/documents/handbook.pdf",
+    )
+    parser.add_argument(
+        "--index-dir",
+        type=Path,
+        default=ROOT / "models" / "vector_store",
+        help="Root index (berisi versions/ dan pointer current)",
+    )
+    parser.add_argument("--no-activate", action="store_true", help="Build versi baru tanpa memindahkan current")
+    parser.add_argument("--keep", type=int, default=5, help="Jumlah versi yang disimpan (default 5)")
+    parser.add_argument(
+        "--hashing",
+        action="store_true",
+        help="Build out-of-core dengan hashing vectorizer (untuk korpus lebih besar dari RAM)",
+    )
+    parser.add_argument("--n-features", type=int, default=2**20, help="Jumlah kolom hashing (default 2^20)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Jumlah chunk per batch/blok (default 1000)")
+    parser.add_argument("--list", action="store_true", help="Tampilkan daftar versi lalu keluar")
+    parser.add_argument(
+        "--rollback",
+        nargs="?",
+        const="",
+        metavar="VERSION",
+        help="Aktifkan versi sebelumnya (atau VERSION tertentu) lalu keluar",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    index_dir = args.index_dir
+
+    if args.list:
+        current = read_current(index_dir)
+        for v in list_versions(index_dir):
+            print(f"{'*' if v == current else ' '} {v}")
+        return
+
+    if args.rollback is not None:
+        version = rollback(index_dir, args.rollback or None)
+        print(f"✅ current sekarang menunjuk ke versi: {version}")
+        return
+
+    pdf_paths: List[Path] = []
+    for path in args.pdf or [ROOT / "data" / "documents" / "handbook.pdf"]:
+        if not path.exists():
+            raise FileNotFoundError(f"PDF tidak ditemukan: {path}")
+        pdf_paths.extend(sorted(path.glob("*.pdf")) if path.is_dir() else [path])
+    if not pdf_paths:
+        raise FileNotFoundError("Tidak ada file PDF yang ditemukan.")
+
+    n_chunks = 0
+
+    def _build(staging: Path) -> None:
+        nonlocal n_chunks
+        if args.hashing:
+            n_chunks = build_hashing_index(
+                pdf_paths, staging, n_features=args.n_features, batch_size=args.batch_size
+            )
+        else:
+            n_chunks = build_index(pdf_paths, staging)
+
+    version = publish_version(
+        index_dir,
+        _build,
+        activate=not args.no_activate,
+        extra_manifest={
+            "sources": [p.name for p in pdf_paths],
+            "mode": "hashing" if args.hashing else "tfidf",
+        },
+    )
+    removed = prune_versions(index_dir, args.keep)
+
+    print(f"✅ RAG index versi {version} berhasil dibuat di: {index_dir / 'versions' / version}")
+    print(f"   Total chunks: {n_chunks}")
+    if args.hashing:
+        print("   File yang dibuat: rows/block_*.npz, docs.jsonl, doc_offsets.npy, hashing.json, idf.npy, manifest.json")
+    else:
+        print("   File yang dibuat: embeddings.npz, docs.json, tfidf.pkl, manifest.json")
+    if args.no_activate:
+        print(f"   current tetap: {read_current(index_dir)}")
+    if removed:
+        print(f"   Versi lama dihapus: {', '.join(removed)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.chatbot import FAQChatbot
+from app.config import (
+    DEFAULT_TENANT,
+    FAQ_PATH,
+    RAG_INDEX_DIR,
+    TENANTS_DATA_DIR,
+    TENANTS_INDEX_DIR,
+)
+from app.tenants import resolve_tenant_paths
+
+# Di-set sebelum fork (ikut ter-share ke worker, copy-on-write) atau oleh _init_worker (spawn)
+_BOT: Optional[FAQChatbot] = None
+_THRESHOLDS: List[Tuple[float, float]] = []
+
+QUESTION_FIELDS = ("question", "message", "query")
+
+
+def _iter_records(f, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    (nomor baris, record) dari file CSV atau JSONL. Baris JSON yang rusak dilewati.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for rec in reader:
+            yield reader.line_num, rec
+        return
+
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"   baris {line_no} dilewati: JSON tidak valid ({e.msg})", file=sys.stderr)
+
+
+def read_queries(path: Path, fmt: str, field: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream pertanyaan dari JSONL atau CSV: {"id": str, "question": str}.
+    Record yang bukan object atau tanpa pertanyaan dilewati (nomor barisnya dicetak ke stderr).
+    """
+    fields = (field,) if field else QUESTION_FIELDS
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for line_no, rec in _iter_records(f, fmt):
+            if not isinstance(rec, dict):
+                print(f"   baris {line_no} dilewati: bukan object JSON", file=sys.stderr)
+                continue
+            question = next((rec[k] for k in fields if rec.get(k)), None)
+            if question is None:
+                print(f"   baris {line_no} dilewati: pertanyaan kosong", file=sys.stderr)
+                continue
+            rec_id = rec.get("id")
+            # id selalu string; tanpa id -> nomor baris di file input
+            yield {"id": str(line_no if rec_id in (None, "") else rec_id), "question": str(question)}
+
+
+def _init_worker(faq_path: str, index_dir: str, thresholds: List[Tuple[float, float]]) -> None:
+    global _BOT, _THRESHOLDS
+    if _BOT is None:
+        _BOT = FAQChatbot(faq_path, enable_rag=True, rag_index_dir=index_dir)
+    _THRESHOLDS = thresholds
+
+
+def _answer_one(item: Dict[str, Any]) -> Dict[str, Any]:
+    results = _BOT.get_answers(item["question"], _THRESHOLDS)
+    for (faq_t, rag_t), res in zip(_THRESHOLDS, results):
+        res["faq_threshold"] = faq_t
+        res["rag_score_threshold"] = rag_t
+
+    if len(results) == 1:
+        return {**item, **results[0]}
+    return {**item, "results": results}
+
+
+def parse_thresholds(value: Optional[str], default: float) -> List[float]:
+    if not value:
+        return [default]
+    return [float(x) for x in value.split(",") if x.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jawab banyak pertanyaan sekaligus (offline) ke JSONL.")
+    parser.add_argument("input", type=Path, help="File pertanyaan (.jsonl atau .csv)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="File output JSONL")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Format input (default: dari ekstensi)")
+    parser.add_argument("--field", help="Nama kolom/field pertanyaan (default: question, message, query)")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help="Tenant / knowledge base")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jumlah proses worker")
+    parser.add_argument("--chunksize", type=int, default=64, help="Jumlah pertanyaan per task worker")
+    parser.add_argument(
+        "--faq-thresholds",
+        help="Sweep faq_threshold, dipisah koma (mis. 0.2,0.25,0.3)",
+    )
+    parser.add_argument(
+        "--rag-thresholds",
+        help="Sweep rag_score_threshold, dipisah koma (mis. 0.1,0.2)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    global _BOT, _THRESHOLDS
+    args = parse_args()
+
+    fmt = args.format or ("csv" if args.input.suffix.lower() == ".csv" else "jsonl")
+
+    paths = resolve_tenant_paths(
+        args.tenant,
+        default_tenant=DEFAULT_TENANT,
+        default_faq_path=FAQ_PATH,
+        default_index_dir=RAG_INDEX_DIR,
+        tenants_data_dir=TENANTS_DATA_DIR,
+        tenants_index_dir=TENANTS_INDEX_DIR,
+    )
+    faq_path, index_dir = str(paths.faq_path), str(paths.rag_index_dir)
+
+    # load sekali di proses utama untuk default threshold & (jika fork) dibagi ke worker
+    _BOT = FAQChatbot(faq_path, enable_rag=True, rag_index_dir=index_dir)
+    _THRESHOLDS = list(
+        itertools.product(
+            parse_thresholds(args.faq_thresholds, _BOT.faq_threshold),
+            parse_thresholds(args.rag_thresholds, _BOT.rag_score_threshold),
+        )
+    )
+
+    queries = read_queries(args.input, fmt, args.field)
+    counts: Dict[Tuple[float, float], Counter] = {t: Counter() for t in _THRESHOLDS}
+    n = 0
+
+    with open(args.output, "w", encoding="utf-8") as out:
+        if args.workers <= 1:
+            answers: Iterator[Dict[str, Any]] = map(_answer_one, queries)
+            pool = None
+        else:
+            if "fork" in mp.get_all_start_methods():
+                ctx = mp.get_context("fork")
+                # index sudah di memori: pindahkan objeknya dari GC supaya halaman
+                # memori tetap ter-share (copy-on-write) dan tidak ikut tersalin
+                gc.freeze()
+            else:
+                ctx = mp.get_context("spawn")
+            pool = ctx.Pool(args.workers, initializer=_init_worker, initargs=(faq_path, index_dir, _THRESHOLDS))
+            answers = pool.imap(_answer_one, queries, chunksize=max(1, args.chunksize))
+
+        try:
+            for row in answers:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                for t, res in zip(_THRESHOLDS, row.get("results", [row])):
+                    counts[t][res["source"]] += 1
+                n += 1
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    print(f"✅ {n} pertanyaan dijawab -> {args.output}", file=sys.stderr)
+    for (faq_t, rag_t), c in counts.items():
+        summary = ", ".join(f"{src}={c.get(src, 0)}" for src in ("faq", "handbook", "none"))
+        print(f"   faq_threshold={faq_t:g} rag_score_threshold={rag_t:g}: {summary}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()